@@ -1,6 +1,93 @@
 import re
 import math
-from typing import Dict, List, Tuple
+from typing import Dict, List, NamedTuple, Tuple
+
+try:
+    import numba
+    import numpy as np
+except ImportError:  # numba is optional; fall back to the pure-Python path
+    numba = None
+
+_VOWELS = frozenset("aeiouy")
+_WORD_RE = re.compile(r'\b\w+\b')
+_WHITESPACE_RE = re.compile(r'\s')
+_PARAGRAPH_BREAK_RE = re.compile(r'\n\s*\n')
+
+
+def _split_on_terminators(text: str) -> List[str]:
+    """Split text on '.', '!' and '?'; runs of terminators yield empty pieces."""
+    return text.replace('!', '.').replace('?', '.').split('.')
+
+
+def _count_terminator_runs(parts: List[str]) -> int:
+    """
+    Count runs of sentence terminators from _split_on_terminators output:
+    the separators that are not directly preceded by another terminator.
+    """
+    return (len(parts) > 1) + sum(1 for part in parts[1:-1] if part)
+
+
+def _count_paragraphs(text: str) -> int:
+    """Count blank-line separated paragraphs without splitting the text."""
+    if not text:
+        return 0
+    if '\n' not in text:
+        return 1
+    return 1 + sum(1 for _ in _PARAGRAPH_BREAK_RE.finditer(text))
+
+
+def _count_vowel_groups(word: str) -> int:
+    """Syllable heuristic for a lowercased, stripped, non-empty word."""
+    count = 0
+    
+    # Handle special cases
+    if word.endswith("e"):
+        word = word[:-1]
+    
+    # Count vowel groups
+    for i, char in enumerate(word):
+        if char in _VOWELS and (i == 0 or word[i-1] not in _VOWELS):
+            count += 1
+    
+    return max(1, count)  # Every word has at least one syllable
+
+
+class _TextStats(NamedTuple):
+    """Token counts shared by all readability formulas."""
+    n_words: int
+    n_sentences: int
+    n_chars: int
+    total_syllables: int
+    complex_words: int
+    n_sentence_ends: int
+    n_paragraphs: int
+
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _syllable_kernel(buf, starts, ends):
+        """
+        Count syllables per word over lowercased UTF-8 word bytes.
+        Mirrors count_syllables: drop a trailing 'e', then count vowel groups.
+        """
+        syllables = np.empty(starts.shape[0], dtype=np.int32)
+        for w in range(starts.shape[0]):
+            start = starts[w]
+            end = ends[w]
+            if end > start and buf[end - 1] == 101:  # 'e'
+                end -= 1
+            count = 0
+            prev_is_vowel = False
+            for i in range(start, end):
+                c = buf[i]
+                # a, e, i, o, u, y
+                is_vowel = c == 97 or c == 101 or c == 105 or c == 111 or c == 117 or c == 121
+                if is_vowel and not prev_is_vowel:
+                    count += 1
+                prev_is_vowel = is_vowel
+            syllables[w] = max(1, count)
+        return syllables
+
 
 class ReadabilityAnalyzer:
     """Service for computing readability metrics for regulatory documents"""
@@ -17,97 +104,124 @@ class ReadabilityAnalyzer:
         if not word:
             return 1
             
-        count = 0
-        vowels = "aeiouy"
-        
-        # Handle special cases
-        if word.endswith("e"):
-            word = word[:-1]
-        
-        # Count vowel groups
-        prev_char = None
-        for i, char in enumerate(word):
-            if not isinstance(char, str):
-                continue  # Skip non-string characters
-            if char in vowels and (i == 0 or word[i-1] not in vowels):
-                count += 1
-        
-        return max(1, count)  # Every word has at least one syllable
+        return _count_vowel_groups(word)
     
     @staticmethod
     def get_sentences(text: str) -> List[str]:
         """Split text into sentences."""
-        # Basic sentence splitting on common end punctuation
-        sentences = re.split(r'[.!?]+', text)
-        return [s.strip() for s in sentences if s.strip()]
+        # Basic sentence splitting on common end punctuation; splitting on a
+        # single character is a plain C scan with no regex backtracking
+        sentences = _split_on_terminators(text)
+        return [s for s in (part.strip() for part in sentences) if s]
     
     @staticmethod
     def get_words(text: str) -> List[str]:
-        """Split text into words."""
-        return re.findall(r'\b\w+\b', text.lower())
+        """Split text into lowercased words."""
+        # Lowercasing can split a word (e.g. 'İ' becomes 'i' plus a combining
+        # dot), so outside ASCII the words are found before lowercasing to match
+        # XMLProcessor.count_words
+        if text.isascii():
+            return _WORD_RE.findall(text.lower())
+        return [word.lower() for word in _WORD_RE.findall(text)]
     
-    @staticmethod
-    def count_complex_words(words: List[str]) -> int:
+    @classmethod
+    def word_syllables(cls, words: List[str]) -> List[int]:
+        """Count the syllables of every word in one pass."""
+        if numba is None or not words:
+            return [cls.count_syllables(word) for word in words]
+        
+        # Words never contain spaces, so the separators give the word offsets
+        buf = np.frombuffer(' '.join(words).encode('utf-8'), dtype=np.uint8)
+        separators = np.flatnonzero(buf == 32).astype(np.int32)
+        starts = np.concatenate((np.zeros(1, dtype=np.int32), separators + 1))
+        ends = np.concatenate((separators, np.array([buf.shape[0]], dtype=np.int32)))
+        return _syllable_kernel(buf, starts, ends).tolist()
+    
+    @classmethod
+    def count_complex_words(cls, words: List[str]) -> int:
         """Count words with 3 or more syllables."""
-        return sum(1 for word in words if ReadabilityAnalyzer.count_syllables(word) >= 3)
+        return sum(1 for s in cls.word_syllables(words) if s >= 3)
     
     @classmethod
-    def compute_flesch_reading_ease(cls, text: str) -> float:
+    def _collect_stats(cls, text: str) -> _TextStats:
         """
-        Compute the Flesch Reading Ease score.
-        Score range: 0-100 (higher is more readable)
+        Tokenize the text once and gather every count the scoring formulas need.
         """
-        sentences = cls.get_sentences(text)
         words = cls.get_words(text)
+        parts = _split_on_terminators(text)
+        n_sentences = sum(1 for part in parts if part and not part.isspace())
+        n_chars = len(_WHITESPACE_RE.sub('', text))
+        n_sentence_ends = _count_terminator_runs(parts)
+        n_paragraphs = _count_paragraphs(text)
         
-        if not words or not sentences:
+        # Every formula scores 0 without words or sentences; skip syllable counting
+        if not words or not n_sentences:
+            return _TextStats(len(words), n_sentences, n_chars, 0, 0, n_sentence_ends, n_paragraphs)
+        
+        syllables = cls.word_syllables(words)
+        complex_words = sum(1 for s in syllables if s >= 3)
+        
+        return _TextStats(
+            len(words), n_sentences, n_chars, sum(syllables), complex_words, n_sentence_ends, n_paragraphs
+        )
+    
+    @staticmethod
+    def _flesch_from_stats(stats: _TextStats) -> float:
+        if not stats.n_words or not stats.n_sentences:
             return 0.0
         
-        total_syllables = sum(cls.count_syllables(word) for word in words)
-        words_per_sentence = len(words) / len(sentences)
-        syllables_per_word = total_syllables / len(words)
+        words_per_sentence = stats.n_words / stats.n_sentences
+        syllables_per_word = stats.total_syllables / stats.n_words
         
         score = 206.835 - (1.015 * words_per_sentence) - (84.6 * syllables_per_word)
         return max(0.0, min(100.0, score))
     
-    @classmethod
-    def compute_smog_index(cls, text: str) -> float:
-        """
-        Compute SMOG Index (Simple Measure of Gobbledygook).
-        Score range: typically 6-20 (lower is more readable)
-        """
-        sentences = cls.get_sentences(text)
-        words = cls.get_words(text)
-        
-        if len(sentences) < 30 or not words:
+    @staticmethod
+    def _smog_from_stats(stats: _TextStats) -> float:
+        if stats.n_sentences < 30 or not stats.n_words:
             return 0.0
         
-        complex_word_count = cls.count_complex_words(words)
-        score = 1.0430 * math.sqrt(complex_word_count * (30 / len(sentences))) + 3.1291
+        score = 1.0430 * math.sqrt(stats.complex_words * (30 / stats.n_sentences)) + 3.1291
         
         # Normalize to 0-100 scale (assuming range of 6-20)
         normalized_score = 100 - ((score - 6) * (100 / 14))
         return max(0.0, min(100.0, normalized_score))
     
-    @classmethod
-    def compute_ari(cls, text: str) -> float:
-        """
-        Compute Automated Readability Index.
-        Score range: typically 1-14 (lower is more readable)
-        """
-        sentences = cls.get_sentences(text)
-        words = cls.get_words(text)
-        characters = len(re.sub(r'\s', '', text))
-        
-        if not words or not sentences:
+    @staticmethod
+    def _ari_from_stats(stats: _TextStats) -> float:
+        if not stats.n_words or not stats.n_sentences:
             return 0.0
         
-        score = 4.71 * (characters / len(words)) + 0.5 * (len(words) / len(sentences)) - 21.43
+        score = 4.71 * (stats.n_chars / stats.n_words) + 0.5 * (stats.n_words / stats.n_sentences) - 21.43
         
         # Normalize to 0-100 scale (assuming range of 1-14)
         normalized_score = 100 - ((score - 1) * (100 / 13))
         return max(0.0, min(100.0, normalized_score))
     
+    @classmethod
+    def compute_flesch_reading_ease(cls, text: str) -> float:
+        """
+        Compute the Flesch Reading Ease score.
+        Score range: 0-100 (higher is more readable)
+        """
+        return cls._flesch_from_stats(cls._collect_stats(text))
+    
+    @classmethod
+    def compute_smog_index(cls, text: str) -> float:
+        """
+        Compute SMOG Index (Simple Measure of Gobbledygook).
+        Score range: typically 6-20 (lower is more readable)
+        """
+        return cls._smog_from_stats(cls._collect_stats(text))
+    
+    @classmethod
+    def compute_ari(cls, text: str) -> float:
+        """
+        Compute Automated Readability Index.
+        Score range: typically 1-14 (lower is more readable)
+        """
+        return cls._ari_from_stats(cls._collect_stats(text))
+    
     @classmethod
     def compute_readability_score(cls, text: str) -> Tuple[float, Dict[str, float]]:
         """
@@ -128,10 +242,27 @@ class ReadabilityAnalyzer:
                 "automated_readability_index": 0.0
             }
         
-        # Compute individual scores
-        flesch_score = cls.compute_flesch_reading_ease(text)
-        smog_score = cls.compute_smog_index(text)
-        ari_score = cls.compute_ari(text)
+        return cls._score_stats(cls._collect_stats(text))
+    
+    @classmethod
+    def analyze_full(cls, text: str) -> Tuple[int, int, int, float, Dict[str, float]]:
+        """
+        Compute the basic counts and the readability scores from one tokenization.
+        Returns a tuple of (word_count, sentence_count, paragraph_count,
+        combined_score, detailed_metrics).
+        
+        sentence_count is the number of runs of '.', '!' or '?', matching
+        XMLProcessor.count_sentences.
+        """
+        stats = cls._collect_stats(text)
+        combined_score, metrics = cls._score_stats(stats)
+        return stats.n_words, stats.n_sentence_ends, stats.n_paragraphs, combined_score, metrics
+    
+    @classmethod
+    def _score_stats(cls, stats: _TextStats) -> Tuple[float, Dict[str, float]]:
+        flesch_score = cls._flesch_from_stats(stats)
+        smog_score = cls._smog_from_stats(stats)
+        ari_score = cls._ari_from_stats(stats)
         
         # Compute weighted average
         combined_score = (
@@ -146,4 +277,4 @@ class ReadabilityAnalyzer:
             "automated_readability_index": ari_score
         }
         
-        return combined_score, metrics 
\ No newline at end of file
+        return combined_score, metrics
\ No newline at end of file
@@ -1,11 +1,34 @@
 import re
 import xml.etree.ElementTree as ET
 from typing import Optional, Dict, Any
-from .readability_analyzer import ReadabilityAnalyzer
+from .readability_analyzer import (
+    ReadabilityAnalyzer,
+    _count_paragraphs,
+    _count_terminator_runs,
+    _split_on_terminators,
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
+_XML_DECLARATION_RE = re.compile(r'<\?xml[^>]+\?>')
+
+# Above this many distinct non-printable characters, one filtering pass beats
+# one str.replace pass per character
+_MAX_NONPRINTABLE_REPLACES = 16
+
+
+def _strip_nonprintable(text: str) -> str:
+    """Remove every character for which str.isprintable() is False."""
+    if text.isprintable():
+        return text
+    nonprintable = [char for char in set(text) if not char.isprintable()]
+    if len(nonprintable) > _MAX_NONPRINTABLE_REPLACES:
+        return ''.join(char for char in text if char.isprintable())
+    for char in nonprintable:
+        text = text.replace(char, '')
+    return text
+
 class XMLProcessor:
     """Service for processing XML content from eCFR API"""
     
@@ -16,24 +39,23 @@ class XMLProcessor:
         Returns None if the XML is invalid.
         """
         try:
-            # Remove XML declaration if present
-            xml_content = re.sub(r'<\?xml[^>]+\?>', '', xml_content)
+            try:
+                # Well-formed documents parse as-is, without copying them into a wrapper
+                root = ET.fromstring(xml_content)
+            except ET.ParseError:
+                # Fragments with several top-level elements need a synthetic root;
+                # the XML declaration is only valid at the very start
+                xml_content = _XML_DECLARATION_RE.sub('', xml_content)
+                root = ET.fromstring(f"<root>{xml_content}</root>")
             
-            # Parse the XML
-            root = ET.fromstring(f"<root>{xml_content}</root>")
-            
-            # Extract all text content
-            text_content = []
-            for elem in root.iter():
-                if elem.text and elem.text.strip():
-                    text_content.append(elem.text.strip())
-                if elem.tail and elem.tail.strip():
-                    text_content.append(elem.tail.strip())
+            # Extract all text content, including tail text, in document order
+            text_content = [t.strip() for t in root.itertext() if t and not t.isspace()]
             
             # Join all text with newlines
             return "\n".join(text_content)
         except Exception as e:
-            print(f"Error processing XML: {str(e)}")
+            # Lazy %-formatting: nothing is rendered unless DEBUG is enabled
+            logger.debug("Error processing XML: %s", e)
             return None
     
     @staticmethod
@@ -71,18 +93,22 @@ class XMLProcessor:
             }
             
         # Remove any non-printable characters
-        text = ''.join(char for char in text if char.isprintable())
-        
-        # Get basic counts
-        word_count = XMLProcessor.count_words(text)
-        sentence_count = XMLProcessor.count_sentences(text)
-        paragraph_count = XMLProcessor.count_paragraphs(text)
+        text = _strip_nonprintable(text)
         
         try:
-            # Compute readability metrics
-            readability_score, detailed_metrics = ReadabilityAnalyzer.compute_readability_score(text)
+            # Basic counts and readability metrics from a single tokenization
+            (
+                word_count,
+                sentence_count,
+                paragraph_count,
+                readability_score,
+                detailed_metrics,
+            ) = ReadabilityAnalyzer.analyze_full(text)
         except Exception as e:
             logger.error(f"Error computing readability metrics: {str(e)}")
+            word_count = XMLProcessor.count_words(text)
+            sentence_count = XMLProcessor.count_sentences(text)
+            paragraph_count = XMLProcessor.count_paragraphs(text)
             readability_score, detailed_metrics = 0.0, {
                 "flesch_reading_ease": 0.0,
                 "smog_index": 0.0,
@@ -109,11 +135,9 @@ class XMLProcessor:
         """Count the number of sentences in a text"""
         if not text:
             return 0
-        return len(re.findall(r'[.!?]+', text))
+        return _count_terminator_runs(_split_on_terminators(text))
     
     @staticmethod
     def count_paragraphs(text: str) -> int:
         """Count the number of paragraphs in a text"""
-        if not text:
-            return 0
-        return len(re.split(r'\n\s*\n', text)) 
\ No newline at end of file
+        return _count_paragraphs(text) 
\ No newline at end of file
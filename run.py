@@ -1,12 +1,14 @@
 import uvicorn
 import os
+import sys
 import argparse
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Run the eCFR Analyzer API")
     parser.add_argument("--host", default="0.0.0.0", help="Host to bind the server to")
     parser.add_argument("--port", type=int, default=8000, help="Port to bind the server to")
-    parser.add_argument("--workers", type=int, default=4, help="Number of worker processes")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4,
+                        help="Number of worker processes (defaults to the CPU count)")
     parser.add_argument("--reload", action="store_true", help="Enable auto-reload")
     parser.add_argument("--log-level", default="info", 
                         choices=["trace", "debug", "info", "warning", "error", "critical"],
@@ -33,6 +35,9 @@ if __name__ == "__main__":
         "reload": args.reload,
         "log_level": args.log_level.lower(),
         "timeout_keep_alive": args.timeout,
+        # C-accelerated event loop and HTTP parser (uvloop is not available on Windows)
+        "loop": "asyncio" if sys.platform == "win32" else "uvloop",
+        "http": "httptools",
         # Increase these timeouts for long-running background tasks
         "timeout_graceful_shutdown": 300,  # 5 minutes for graceful shutdown
         "limit_concurrency": 100,  # Allow more concurrent connections
@@ -0,0 +1,30 @@
+# cython: language_level=3
+"""
+Compiled version of the citation-skipping text walk used by
+convert_cfr_xml_to_json.extract_text_from_element. Build it with
+`python scripts/setup_text_extract.py build_ext --inplace`.
+"""
+from lxml import etree
+
+
+def collect_text(element, tuple citation_tags):
+    """Join the text and tails under element, skipping citation subtrees."""
+    cdef list fragments = []
+    cdef str event
+    cdef object elem, text
+
+    walker = etree.iterwalk(element, events=('start', 'end'))
+    for event, elem in walker:
+        if event == 'start':
+            if elem is not element and (<str>elem.tag).endswith(citation_tags):
+                walker.skip_subtree()
+            else:
+                text = elem.text
+                if text:
+                    fragments.append(text)
+        elif elem is not element:
+            text = elem.tail
+            if text:
+                fragments.append(text)
+
+    return " ".join(fragments)
@@ -6,9 +6,6 @@ This script provides statistics about the historical metrics data.
 
 import sys
 import os
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
 from sqlalchemy import func, extract
 
 # Add the parent directory to sys.path to allow imports from the app package
@@ -23,31 +20,45 @@ def analyze_metrics_data():
     """Analyze metrics data and print statistics."""
     db = SessionLocal()
     try:
+        Metrics = AgencyRegulationDocumentHistoricalMetrics
+        year = extract('year', Metrics.metrics_date)
+        
+        # Per-year counts and averages plus the overall rollup in a single scan.
+        # ROLLUP(year) is GROUPING SETS ((year), ()); the () row has grouping() = 1.
+        yearly_rows = db.query(
+            year.label('year'),
+            func.grouping(year).label('is_total'),
+            func.count(Metrics.id).label('count'),
+            func.avg(Metrics.word_count).label('avg_word_count'),
+            func.avg(Metrics.paragraph_count).label('avg_paragraph_count'),
+            func.avg(Metrics.sentence_count).label('avg_sentence_count'),
+            func.avg(Metrics.language_complexity_score).label('avg_complexity'),
+            func.avg(Metrics.readability_score).label('avg_readability'),
+            func.avg(Metrics.simplicity_score).label('avg_simplicity')
+        ).group_by(func.rollup(year)).all()
+        
+        totals = next((row for row in yearly_rows if row.is_total), None)
+        metrics_by_year = sorted((row for row in yearly_rows if not row.is_total), key=lambda row: row.year)
+        
         # Count total metrics
-        total_metrics = db.query(func.count(AgencyRegulationDocumentHistoricalMetrics.id)).scalar()
+        total_metrics = totals.count if totals else 0
         print(f"Total metrics records: {total_metrics}")
         
         if total_metrics == 0:
             print("No metrics data found. Run the generate_fake_metrics.py script first.")
             return
         
-        # Count metrics by year
-        metrics_by_year = db.query(
-            extract('year', AgencyRegulationDocumentHistoricalMetrics.metrics_date).label('year'),
-            func.count(AgencyRegulationDocumentHistoricalMetrics.id).label('count')
-        ).group_by('year').order_by('year').all()
-        
         print("\nMetrics by year:")
-        for year, count in metrics_by_year:
-            print(f"  {int(year)}: {count} records")
+        for row in metrics_by_year:
+            print(f"  {int(row.year)}: {row.count} records")
         
         # Count metrics by agency
         metrics_by_agency = db.query(
             Agency.name,
-            func.count(AgencyRegulationDocumentHistoricalMetrics.id).label('count')
-        ).join(Agency, Agency.id == AgencyRegulationDocumentHistoricalMetrics.agency_id)\
+            func.count(Metrics.id).label('count')
+        ).join(Agency, Agency.id == Metrics.agency_id)\
          .group_by(Agency.name)\
-         .order_by(func.count(AgencyRegulationDocumentHistoricalMetrics.id).desc())\
+         .order_by(func.count(Metrics.id).desc())\
          .limit(10)\
          .all()
         
@@ -55,75 +66,54 @@ def analyze_metrics_data():
         for agency_name, count in metrics_by_agency:
             print(f"  {agency_name}: {count} records")
         
-        # Get average metrics values
-        avg_metrics = db.query(
-            func.avg(AgencyRegulationDocumentHistoricalMetrics.word_count).label('avg_word_count'),
-            func.avg(AgencyRegulationDocumentHistoricalMetrics.paragraph_count).label('avg_paragraph_count'),
-            func.avg(AgencyRegulationDocumentHistoricalMetrics.sentence_count).label('avg_sentence_count'),
-            func.avg(AgencyRegulationDocumentHistoricalMetrics.language_complexity_score).label('avg_complexity'),
-            func.avg(AgencyRegulationDocumentHistoricalMetrics.readability_score).label('avg_readability'),
-            func.avg(AgencyRegulationDocumentHistoricalMetrics.simplicity_score).label('avg_simplicity')
-        ).first()
-        
         print("\nAverage metrics values:")
-        print(f"  Word count: {avg_metrics.avg_word_count:.2f}")
-        print(f"  Paragraph count: {avg_metrics.avg_paragraph_count:.2f}")
-        print(f"  Sentence count: {avg_metrics.avg_sentence_count:.2f}")
-        print(f"  Complexity score: {avg_metrics.avg_complexity:.2f}")
-        print(f"  Readability score: {avg_metrics.avg_readability:.2f}")
-        print(f"  Simplicity score: {avg_metrics.avg_simplicity:.2f}")
-        
-        # Get metrics trends over time
-        metrics_trends = db.query(
-            extract('year', AgencyRegulationDocumentHistoricalMetrics.metrics_date).label('year'),
-            func.avg(AgencyRegulationDocumentHistoricalMetrics.word_count).label('avg_word_count'),
-            func.avg(AgencyRegulationDocumentHistoricalMetrics.language_complexity_score).label('avg_complexity'),
-            func.avg(AgencyRegulationDocumentHistoricalMetrics.readability_score).label('avg_readability'),
-            func.avg(AgencyRegulationDocumentHistoricalMetrics.simplicity_score).label('avg_simplicity')
-        ).group_by('year').order_by('year').all()
+        print(f"  Word count: {totals.avg_word_count:.2f}")
+        print(f"  Paragraph count: {totals.avg_paragraph_count:.2f}")
+        print(f"  Sentence count: {totals.avg_sentence_count:.2f}")
+        print(f"  Complexity score: {totals.avg_complexity:.2f}")
+        print(f"  Readability score: {totals.avg_readability:.2f}")
+        print(f"  Simplicity score: {totals.avg_simplicity:.2f}")
         
         print("\nMetrics trends over time:")
         print("  Year | Word Count | Complexity | Readability | Simplicity")
         print("  ------------------------------------------------")
-        for trend in metrics_trends:
+        for trend in metrics_by_year:
             print(f"  {int(trend.year)} | {trend.avg_word_count:.0f} | {trend.avg_complexity:.2f} | {trend.avg_readability:.2f} | {trend.avg_simplicity:.2f}")
         
-        # Get document with most metrics
-        doc_with_most_metrics = db.query(
-            AgencyDocument.title,
-            func.count(AgencyRegulationDocumentHistoricalMetrics.id).label('metrics_count')
-        ).join(AgencyRegulationDocumentHistoricalMetrics, 
-               AgencyRegulationDocumentHistoricalMetrics.document_id == AgencyDocument.id)\
+        # Rank documents by metrics count, complexity and readability in one scan
+        metrics_count = func.count(Metrics.id)
+        avg_complexity = func.avg(Metrics.language_complexity_score)
+        avg_readability = func.avg(Metrics.readability_score)
+        ranked_docs = db.query(
+            AgencyDocument.title.label('title'),
+            metrics_count.label('metrics_count'),
+            avg_complexity.label('avg_complexity'),
+            avg_readability.label('avg_readability'),
+            func.row_number().over(order_by=metrics_count.desc()).label('count_rank'),
+            func.row_number().over(order_by=avg_complexity.desc()).label('complexity_rank'),
+            func.row_number().over(order_by=avg_readability.desc()).label('readability_rank')
+        ).join(Metrics, Metrics.document_id == AgencyDocument.id)\
          .group_by(AgencyDocument.title)\
-         .order_by(func.count(AgencyRegulationDocumentHistoricalMetrics.id).desc())\
-         .first()
+         .subquery()
         
+        top_docs = db.query(ranked_docs).filter(
+            (ranked_docs.c.count_rank == 1)
+            | (ranked_docs.c.complexity_rank == 1)
+            | (ranked_docs.c.readability_rank == 1)
+        ).all()
+        
+        # Get document with most metrics
+        doc_with_most_metrics = next((doc for doc in top_docs if doc.count_rank == 1), None)
         if doc_with_most_metrics:
             print(f"\nDocument with most metrics: {doc_with_most_metrics.title} ({doc_with_most_metrics.metrics_count} records)")
         
         # Get document with highest complexity
-        doc_with_highest_complexity = db.query(
-            AgencyDocument.title,
-            func.avg(AgencyRegulationDocumentHistoricalMetrics.language_complexity_score).label('avg_complexity')
-        ).join(AgencyRegulationDocumentHistoricalMetrics, 
-               AgencyRegulationDocumentHistoricalMetrics.document_id == AgencyDocument.id)\
-         .group_by(AgencyDocument.title)\
-         .order_by(func.avg(AgencyRegulationDocumentHistoricalMetrics.language_complexity_score).desc())\
-         .first()
-        
+        doc_with_highest_complexity = next((doc for doc in top_docs if doc.complexity_rank == 1), None)
         if doc_with_highest_complexity:
             print(f"Document with highest complexity: {doc_with_highest_complexity.title} (score: {doc_with_highest_complexity.avg_complexity:.2f})")
         
         # Get document with highest readability
-        doc_with_highest_readability = db.query(
-            AgencyDocument.title,
-            func.avg(AgencyRegulationDocumentHistoricalMetrics.readability_score).label('avg_readability')
-        ).join(AgencyRegulationDocumentHistoricalMetrics, 
-               AgencyRegulationDocumentHistoricalMetrics.document_id == AgencyDocument.id)\
-         .group_by(AgencyDocument.title)\
-         .order_by(func.avg(AgencyRegulationDocumentHistoricalMetrics.readability_score).desc())\
-         .first()
-        
+        doc_with_highest_readability = next((doc for doc in top_docs if doc.readability_rank == 1), None)
         if doc_with_highest_readability:
             print(f"Document with highest readability: {doc_with_highest_readability.title} (score: {doc_with_highest_readability.avg_readability:.2f})")
     
@@ -32,8 +32,19 @@ def clean_metrics_data():
             print("Operation cancelled.")
             return
         
-        # Delete all metrics
-        db.query(AgencyRegulationDocumentHistoricalMetrics).delete()
+        # Delete all metrics. TRUNCATE is constant-time in PostgreSQL and also
+        # resets any identity sequence. It runs on the session's own connection
+        # so it doesn't wait on the lock taken by the count query above.
+        try:
+            db.execute(text(f"TRUNCATE TABLE {AgencyRegulationDocumentHistoricalMetrics.__tablename__} RESTART IDENTITY"))
+            db.commit()
+            print(f"Successfully deleted {count} metrics records")
+            return
+        except Exception as e:
+            db.rollback()
+            print(f"Note: TRUNCATE unavailable, falling back to DELETE: {e}")
+        
+        db.query(AgencyRegulationDocumentHistoricalMetrics).delete(synchronize_session=False)
         db.commit()
         print(f"Successfully deleted {count} metrics records")
         
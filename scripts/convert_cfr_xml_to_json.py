@@ -18,6 +18,7 @@ import re
 import json
 import argparse
 import glob
+import sqlite3
 from pathlib import Path
 try:
     from lxml import etree as ET
@@ -25,7 +26,12 @@ except ImportError:
     print("ERROR: lxml package is required. Please install it with: pip install lxml")
     print("Then run this script again.")
     exit(1)
+try:
+    import orjson
+except ImportError:
+    orjson = None
 from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import logging
 from tqdm import tqdm
 
@@ -45,6 +51,316 @@ namespaces = {
     'ns': 'http://www.govinfo.gov/cfr/exchange/CFR'
 }
 
+# Precompiled patterns used for every element
+_WS_RE = re.compile(r'\s+')
+_SECTNO_RE = re.compile(r'(\d+\.\d+)')
+_PARTNO_RE = re.compile(r'(\d+)')
+_FNAME_RE = re.compile(r'CFR-(\d+)-title(\d+)-vol(\d+)')
+
+def write_json(path, data):
+    """Write data as indented UTF-8 JSON, using orjson's C encoder when available."""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+def dumps_json(data):
+    """Encode data as compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+def read_json(path):
+    """Read a JSON file written by write_json."""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+# Section store read by lookup_cfr_section.py: one row per section, so a lookup
+# is a single primary-key read instead of parsing a whole title file
+STORE_FILENAME = "sections.db"
+STORE_SCHEMA = """
+CREATE TABLE titles (
+    year TEXT NOT NULL,
+    title TEXT NOT NULL,
+    file TEXT NOT NULL,
+    PRIMARY KEY (year, title)
+) WITHOUT ROWID;
+CREATE TABLE parts (
+    year TEXT NOT NULL,
+    title TEXT NOT NULL,
+    part TEXT NOT NULL,
+    part_title TEXT NOT NULL,
+    PRIMARY KEY (year, title, part)
+) WITHOUT ROWID;
+CREATE TABLE sections (
+    year TEXT NOT NULL,
+    title TEXT NOT NULL,
+    part TEXT NOT NULL,
+    section TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (year, title, part, section)
+) WITHOUT ROWID;
+"""
+
+# Elements holding citations or explanatory material rather than regulatory text
+CITATION_TAGS = ('CITE', 'CITA', 'FTNT')
+
+def extract_title_part_info(filename):
+    """Extract title and part information from the filename."""
+    match = _FNAME_RE.search(filename)
+    if match:
+        year = match.group(1)
+        title = match.group(2)
+        volume = match.group(3)
+        return year, title, volume
+    return None, None, None
+
+def clean_text(text):
+    """Clean and normalize text content."""
+    if text is None:
+        return ""
+
+    # Remove extra whitespace
+    text = _WS_RE.sub(' ', text).strip()
+
+    # lxml has already decoded entities; only double-encoded text still
+    # contains them, so skip the three replace scans when there is no '&'
+    if '&' in text:
+        text = text.replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&')
+
+    return text
+
+def _collect_text(element, citation_tags):
+    """Join the text and tails under element, skipping citation subtrees."""
+    fragments = []
+
+    # One C-level walk over the subtree; citation subtrees are skipped whole,
+    # but their tail text belongs to the parent and is kept
+    walker = ET.iterwalk(element, events=('start', 'end'))
+    for event, elem in walker:
+        if event == 'start':
+            if elem is not element and elem.tag.endswith(citation_tags):
+                walker.skip_subtree()
+            elif elem.text:
+                fragments.append(elem.text)
+        elif elem is not element and elem.tail:
+            fragments.append(elem.tail)
+
+    return " ".join(fragments)
+
+# Use the compiled walk from _text_extract.pyx when it has been built with
+# setup_text_extract.py; this module is run both as a script and as
+# scripts.convert_cfr_xml_to_json
+try:
+    if __package__:
+        from ._text_extract import collect_text as _collect_text
+    else:
+        from _text_extract import collect_text as _collect_text
+    TEXT_EXTRACT_IMPL = "compiled _text_extract extension"
+except ImportError:
+    TEXT_EXTRACT_IMPL = "pure-Python fallback (build it with scripts/setup_text_extract.py)"
+
+def extract_text_from_element(element):
+    """Extract text from an XML element and its children, skipping citations."""
+    if element is None:
+        return ""
+
+    return clean_text(_collect_text(element, CITATION_TAGS))
+
+def find_first(element, tag):
+    """
+    Return the first descendant with the given tag, like find('.//' + tag),
+    but as a lazy C-level iteration that stops at the first match.
+    """
+    return next(element.iterdescendants(tag), None)
+
+def process_section(section_element):
+    """Process a section element and extract its content."""
+    section_num = find_first(section_element, 'SECTNO')
+    section_subject = find_first(section_element, 'SUBJECT')
+
+    # Extract section number and clean it
+    if section_num is not None and section_num.text:
+        section_number = clean_text(section_num.text)
+        # Extract just the number part (e.g., "§ 1.1" -> "1.1")
+        match = _SECTNO_RE.search(section_number)
+        if match:
+            section_number = match.group(1)
+    else:
+        section_number = "unknown"
+
+    # Extract section title/subject
+    section_title = ""
+    if section_subject is not None:
+        section_title = extract_text_from_element(section_subject)
+
+    # Extract the content (excluding citations) in one walk over the section:
+    # citation subtrees are skipped whole, so no paragraph needs an ancestor
+    # check. P paragraphs come before FP paragraphs, each in document order.
+    paragraphs = []
+    flush_paragraphs = []
+
+    walker = ET.iterwalk(section_element, events=('start',))
+    for _, elem in walker:
+        tag = elem.tag
+        if tag.endswith(CITATION_TAGS):
+            walker.skip_subtree()
+        elif tag == 'P':
+            paragraphs.append(extract_text_from_element(elem))
+        elif tag == 'FP':
+            flush_paragraphs.append(extract_text_from_element(elem))
+
+    content = "\n\n".join(text for text in paragraphs + flush_paragraphs if text)
+
+    return {
+        "section_number": section_number,
+        "section_title": section_title,
+        "content": content
+    }
+
+def process_part(part_element):
+    """
+    Extract the number and title of a part element.
+    Sections are filled in by process_xml_file as they are streamed.
+    """
+    part_num = find_first(part_element, 'PARTNO')
+    part_subject = find_first(part_element, 'SUBJECT')
+
+    # Extract part number
+    if part_num is not None and part_num.text:
+        part_number = clean_text(part_num.text)
+        # Extract just the number part (e.g., "PART 1" -> "1")
+        match = _PARTNO_RE.search(part_number)
+        if match:
+            part_number = match.group(1)
+    else:
+        part_number = "unknown"
+
+    # Extract part title
+    part_title = ""
+    if part_subject is not None:
+        part_title = extract_text_from_element(part_subject)
+
+    return {
+        "part_number": part_number,
+        "part_title": part_title,
+        "sections": {}
+    }
+
+def free_element(element):
+    """Release a processed element and the already-processed siblings before it."""
+    element.clear()
+    parent = element.getparent()
+    if parent is not None:
+        while element.getprevious() is not None:
+            del parent[0]
+
+def process_xml_file(xml_file, output_dir):
+    """
+    Process a single XML file and write its content to a per-volume JSON file.
+    Runs in a worker process; returns (title_num, year, volume_file, shard_file)
+    or None, where shard_file holds the volume's lookup index entries.
+    """
+    volume_file = None
+    try:
+        year, title_num, volume = extract_title_part_info(xml_file)
+        if not all([year, title_num, volume]):
+            logger.warning(f"Could not extract title/part info from {xml_file}")
+            return None
+
+        logger.info(f"Processing {xml_file} (Year: {year}, Title: {title_num}, Volume: {volume})")
+
+        # Stream the XML file: every SECTION is processed as soon as it closes and
+        # then freed, so only about one section's subtree is in memory at a time.
+        # recover=True keeps going past malformed markup. Comments and processing
+        # instructions are dropped by the parser, which merges the text around them.
+        # The files use no xml:id lookups, so skip building the ID table. Entities
+        # are still resolved: an unresolved one would become an Entity node whose
+        # tag is not a string.
+        context = ET.iterparse(
+            xml_file,
+            events=('end',),
+            tag=('PART', 'SECTION'),
+            recover=True,
+            huge_tree=True,
+            remove_blank_text=True,
+            remove_comments=True,
+            remove_pis=True,
+            collect_ids=False
+        )
+
+        # Write this volume from the worker; only the small file path travels
+        # back to the parent process instead of the pickled title data
+        year_dir = os.path.join(output_dir, year)
+        os.makedirs(year_dir, exist_ok=True)
+        volume_file = os.path.join(year_dir, f"title_{title_num}_vol_{volume}.json")
+
+        # Index this volume here too, so the parent merges small shards of part
+        # headings and section keys instead of walking the merged content again
+        index_shard = {}
+
+        with open(volume_file, 'wb') as out:
+            # Each part is written as soon as it closes, so the whole volume is
+            # never held as one dict. A repeated part number becomes a duplicate
+            # key, which JSON readers resolve to the last one, as a dict would.
+            out.write(b'{"year": ' + dumps_json(year) +
+                      b', "title_number": ' + dumps_json(title_num) +
+                      b', "volume": ' + dumps_json(volume) +
+                      b', "parts": {')
+            separator = b''
+
+            part_elem = None
+            part_data = None
+
+            for _, elem in context:
+                if elem.tag == 'SECTION':
+                    enclosing_part = next(elem.iterancestors('PART'), None)
+                    if enclosing_part is not None:
+                        # The first section of a part closes after the part's own
+                        # PARTNO/SUBJECT, so the part header can be read here
+                        if enclosing_part is not part_elem:
+                            part_elem = enclosing_part
+                            part_data = process_part(part_elem)
+
+                        section_data = process_section(elem)
+                        section_number = section_data["section_number"]
+                        part_data["sections"][section_number] = section_data
+                else:
+                    # A part without sections has not been seen yet
+                    if elem is not part_elem:
+                        part_data = process_part(elem)
+                    part_number = part_data["part_number"]
+                    out.write(separator + dumps_json(part_number) + b': ' + dumps_json(part_data))
+                    separator = b', '
+                    index_shard[part_number] = {
+                        "part_title": part_data["part_title"],
+                        "sections": list(part_data["sections"].keys())
+                    }
+                    part_elem = None
+                    part_data = None
+
+                free_element(elem)
+            del context
+
+            out.write(b'}}')
+
+        shard_file = os.path.join(year_dir, f"_index_shard_{title_num}_{year}_vol_{volume}.json")
+        write_json(shard_file, index_shard)
+
+        return title_num, year, volume_file, shard_file
+
+    except Exception as e:
+        logger.error(f"Error processing {xml_file}: {str(e)}")
+        # Do not leave a half-written volume behind
+        if volume_file is not None and os.path.exists(volume_file):
+            os.remove(volume_file)
+        return None
+
 class CFRConverter:
     """Converts CFR XML files to JSON format optimized for lookups."""
     
@@ -52,180 +368,13 @@ class CFRConverter:
         self.input_dir = input_dir
         self.output_dir = output_dir
         self.title_data = {}
+        self.index = {}
         
     def find_xml_files(self):
         """Find all CFR XML files in the input directory."""
         pattern = os.path.join(self.input_dir, "**", "CFR-*.xml")
         return glob.glob(pattern, recursive=True)
     
-    def extract_title_part_info(self, filename):
-        """Extract title and part information from the filename."""
-        match = re.search(r'CFR-(\d+)-title(\d+)-vol(\d+)', filename)
-        if match:
-            year = match.group(1)
-            title = match.group(2)
-            volume = match.group(3)
-            return year, title, volume
-        return None, None, None
-    
-    def clean_text(self, text):
-        """Clean and normalize text content."""
-        if text is None:
-            return ""
-        
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        # Remove XML-specific characters
-        text = text.replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&')
-        
-        return text
-    
-    def extract_text_from_element(self, element):
-        """Extract text from an XML element and its children."""
-        if element is None:
-            return ""
-            
-        # Get direct text
-        text = element.text or ""
-        
-        # Get text from children
-        for child in element:
-            # Skip citation elements
-            if child.tag.endswith(('CITE', 'CITA', 'FTNT')):
-                continue
-                
-            # Add text from this child
-            if child.text:
-                text += " " + child.text
-                
-            # Recursively get text from this child's children
-            text += " " + self.extract_text_from_element(child)
-                
-            # Add tail text
-            if child.tail:
-                text += " " + child.tail
-                
-        return self.clean_text(text)
-    
-    def is_within_citation(self, element):
-        """Check if an element is within a citation element."""
-        parent = element.getparent()
-        while parent is not None:
-            if parent.tag.endswith(('CITE', 'CITA', 'FTNT')):
-                return True
-            parent = parent.getparent()
-        return False
-    
-    def process_section(self, section_element):
-        """Process a section element and extract its content."""
-        section_num = section_element.find('.//SECTNO')
-        section_subject = section_element.find('.//SUBJECT')
-        
-        # Extract section number and clean it
-        if section_num is not None and section_num.text:
-            section_number = self.clean_text(section_num.text)
-            # Extract just the number part (e.g., "§ 1.1" -> "1.1")
-            section_number = re.sub(r'^.*?(\d+\.\d+).*$', r'\1', section_number)
-        else:
-            section_number = "unknown"
-            
-        # Extract section title/subject
-        section_title = ""
-        if section_subject is not None:
-            section_title = self.extract_text_from_element(section_subject)
-            
-        # Extract the content (excluding citations)
-        content_elements = section_element.findall('.//P') + section_element.findall('.//FP')
-        content = ""
-        
-        for elem in content_elements:
-            # Skip if this is within a citation
-            if self.is_within_citation(elem):
-                continue
-                
-            # Extract text from this paragraph
-            para_text = self.extract_text_from_element(elem)
-            if para_text:
-                content += para_text + "\n\n"
-                
-        return {
-            "section_number": section_number,
-            "section_title": section_title,
-            "content": content.strip()
-        }
-    
-    def process_part(self, part_element):
-        """Process a part element and extract its sections."""
-        part_num = part_element.find('.//PARTNO')
-        part_subject = part_element.find('.//SUBJECT')
-        
-        # Extract part number
-        if part_num is not None and part_num.text:
-            part_number = self.clean_text(part_num.text)
-            # Extract just the number part (e.g., "PART 1" -> "1")
-            part_number = re.sub(r'^.*?(\d+).*$', r'\1', part_number)
-        else:
-            part_number = "unknown"
-            
-        # Extract part title
-        part_title = ""
-        if part_subject is not None:
-            part_title = self.extract_text_from_element(part_subject)
-            
-        # Process all sections in this part
-        sections = {}
-        section_elements = part_element.findall('.//SECTION')
-        
-        for section_elem in section_elements:
-            section_data = self.process_section(section_elem)
-            section_number = section_data["section_number"]
-            sections[section_number] = section_data
-            
-        return {
-            "part_number": part_number,
-            "part_title": part_title,
-            "sections": sections
-        }
-    
-    def process_xml_file(self, xml_file):
-        """Process a single XML file and extract its content."""
-        try:
-            year, title_num, volume = self.extract_title_part_info(xml_file)
-            if not all([year, title_num, volume]):
-                logger.warning(f"Could not extract title/part info from {xml_file}")
-                return None
-                
-            logger.info(f"Processing {xml_file} (Year: {year}, Title: {title_num}, Volume: {volume})")
-            
-            # Parse the XML file
-            parser = ET.XMLParser(recover=True)  # Use a parser that can recover from errors
-            tree = ET.parse(xml_file, parser)
-            root = tree.getroot()
-            
-            # Process all parts in this title
-            parts = {}
-            part_elements = root.findall('.//PART')
-            
-            for part_elem in part_elements:
-                part_data = self.process_part(part_elem)
-                part_number = part_data["part_number"]
-                parts[part_number] = part_data
-                
-            # Create the title data structure
-            title_data = {
-                "year": year,
-                "title_number": title_num,
-                "volume": volume,
-                "parts": parts
-            }
-            
-            return title_num, year, title_data
-            
-        except Exception as e:
-            logger.error(f"Error processing {xml_file}: {str(e)}")
-            return None
-    
     def save_json(self, title_num, year, data):
         """Save the processed data to a JSON file."""
         # Create output directory if it doesn't exist
@@ -234,8 +383,7 @@ class CFRConverter:
         
         # Save to JSON file
         output_file = os.path.join(year_dir, f"title_{title_num}.json")
-        with open(output_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        write_json(output_file, data)
             
         logger.info(f"Saved {output_file}")
     
@@ -267,53 +415,108 @@ class CFRConverter:
         """Convert all CFR XML files to JSON."""
         xml_files = self.find_xml_files()
         logger.info(f"Found {len(xml_files)} XML files to process")
+        logger.info(f"Text extraction: {TEXT_EXTRACT_IMPL}")
         
         # Create output directory if it doesn't exist
         os.makedirs(self.output_dir, exist_ok=True)
         
         # Process files in parallel
-        with ProcessPoolExecutor(max_workers=4) as executor:
-            results = list(tqdm(executor.map(self.process_xml_file, xml_files), total=len(xml_files)))
+        # Parsing is CPU-bound inside lxml, so use one process per core (but never
+        # more than there are files) and hand each about four chunks of files
+        max_workers = max(1, min(os.cpu_count() or 4, len(xml_files)))
+        chunksize = max(1, len(xml_files) // (max_workers * 4))
+        
+        # Workers get a module-level function and the file path, so nothing from this
+        # converter is pickled per task; chunksize batches the IPC round-trips
+        worker = partial(process_xml_file, output_dir=self.output_dir)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(tqdm(executor.map(worker, xml_files, chunksize=chunksize), total=len(xml_files)))
             
-        # Merge results and save to JSON
+        # Group the per-volume files by title, keeping the input order for merging
+        volume_files = {}
         for result in results:
             if result is not None:
-                title_num, year, title_data = result
-                self.merge_title_data(title_num, year, title_data)
+                title_num, year, volume_file, shard_file = result
+                volume_files.setdefault((title_num, year), []).append((volume_file, shard_file))
+                
+        # Merge and save one title at a time so only that title is held in memory
+        store = self.open_store()
+        for (title_num, year), files in volume_files.items():
+            for volume_file, shard_file in files:
+                self.merge_title_data(title_num, year, read_json(volume_file))
+                self.merge_index_shard(title_num, year, read_json(shard_file))
+                os.remove(volume_file)
+                os.remove(shard_file)
                 
-        # Save all merged title data
-        for (title_num, year), data in self.title_data.items():
+            data = self.title_data.pop((title_num, year))
             self.save_json(title_num, year, data)
+            self.store_title_data(store, title_num, year, data)
             
+        store.commit()
+        store.close()
         logger.info(f"Conversion complete. JSON files saved to {self.output_dir}")
         
         # Create lookup index
         self.create_lookup_index()
     
+    def open_store(self):
+        """Create an empty section store, replacing the one from a previous run."""
+        store_file = os.path.join(self.output_dir, STORE_FILENAME)
+        if os.path.exists(store_file):
+            os.remove(store_file)
+        store = sqlite3.connect(store_file)
+        store.executescript(STORE_SCHEMA)
+        return store
+    
+    def store_title_data(self, store, title_num, year, data):
+        """Write the parts and sections of a merged title to the section store."""
+        store.execute(
+            "INSERT INTO titles (year, title, file) VALUES (?, ?, ?)",
+            (year, title_num, f"title_{title_num}.json")
+        )
+        store.executemany(
+            "INSERT INTO parts (year, title, part, part_title) VALUES (?, ?, ?, ?)",
+            (
+                (year, title_num, part_num, part_data["part_title"])
+                for part_num, part_data in data["parts"].items()
+            )
+        )
+        store.executemany(
+            "INSERT INTO sections (year, title, part, section, data) VALUES (?, ?, ?, ?, ?)",
+            (
+                (year, title_num, part_num, section_num, dumps_json(section_data).decode('utf-8'))
+                for part_num, part_data in data["parts"].items()
+                for section_num, section_data in part_data["sections"].items()
+            )
+        )
+    
+    def merge_index_shard(self, title_num, year, shard):
+        """
+        Merge a volume's index shard into the lookup index, with the same
+        first-wins rules as merge_title_data.
+        """
+        if year not in self.index:
+            self.index[year] = {}
+            
+        if title_num not in self.index[year]:
+            self.index[year][title_num] = {
+                "file": f"title_{title_num}.json",
+                "parts": {}
+            }
+            
+        existing_parts = self.index[year][title_num]["parts"]
+        for part_num, part_index in shard.items():
+            if part_num not in existing_parts:
+                existing_parts[part_num] = part_index
+            else:
+                existing_sections = existing_parts[part_num]["sections"]
+                known = set(existing_sections)
+                existing_sections.extend(s for s in part_index["sections"] if s not in known)
+    
     def create_lookup_index(self):
-        """Create a lookup index for all titles, parts, and sections."""
-        index = {}
-        
-        for (title_num, year), data in self.title_data.items():
-            if year not in index:
-                index[year] = {}
-                
-            if title_num not in index[year]:
-                index[year][title_num] = {
-                    "file": f"title_{title_num}.json",
-                    "parts": {}
-                }
-                
-            for part_num, part_data in data["parts"].items():
-                index[year][title_num]["parts"][part_num] = {
-                    "part_title": part_data["part_title"],
-                    "sections": list(part_data["sections"].keys())
-                }
-                
-        # Save index to JSON
+        """Save the lookup index for all titles, parts, and sections."""
         index_file = os.path.join(self.output_dir, "index.json")
-        with open(index_file, 'w') as f:
-            json.dump(index, f, indent=2)
+        write_json(index_file, self.index)
             
         logger.info(f"Created lookup index: {index_file}")
 
@@ -6,10 +6,13 @@ This script creates search descriptors and documents for each agency.
 
 import sys
 import os
+import math
 import random
 import uuid
 from datetime import datetime, date, timedelta
+from itertools import permutations
 from faker import Faker
+import numpy as np
 from sqlalchemy import func
 
 # Add the parent directory to sys.path to allow imports from the app package
@@ -21,10 +24,19 @@ from app.models.search_descriptor import AgencyTitleSearchDescriptor
 from app.models.document import AgencyDocument
 
 fake = Faker()
+rng = np.random.default_rng()
 
 # Configuration
 DESCRIPTORS_PER_AGENCY = 20
-BATCH_SIZE = 50
+BATCH_SIZE = 5000
+POOL_SIZE = 256  # Distinct faker strings pregenerated per kind
+
+# Faker's text builders are slow pure Python and the output is interchangeable
+# noise, so draw from pools generated once at startup
+BS_POOL = np.array([fake.bs().title() for _ in range(POOL_SIZE)])
+CATCH_PHRASE_POOL = np.array([fake.catch_phrase().title() for _ in range(POOL_SIZE)])
+PARAGRAPH_POOL = np.array([fake.paragraph(nb_sentences=3) for _ in range(POOL_SIZE)])
+CONTENT_POOL = [fake.text(max_nb_chars=2000) for _ in range(POOL_SIZE)]
 
 # Document title templates for more realistic regulation titles
 DOCUMENT_TITLE_TEMPLATES = [
@@ -60,9 +72,16 @@ REGULATION_SECTORS = [
 ]
 
 # Types for search descriptors
-DESCRIPTOR_TYPES = [
+DESCRIPTOR_TYPES = np.array([
     "PART", "SUBPART", "SECTION", "APPENDIX", "CHAPTER"
-]
+])
+
+# Every ordered pick of 1-3 change types; the weights give each size the same
+# total chance and each pick within a size an equal share, as
+# random.sample(CHANGE_TYPES, k=random.randint(1, 3)) would
+CHANGE_TYPES = ["ADDED", "MODIFIED", "REMOVED", "UNCHANGED"]
+CHANGE_TYPE_COMBOS = [list(combo) for k in (1, 2, 3) for combo in permutations(CHANGE_TYPES, k)]
+CHANGE_TYPE_WEIGHTS = np.array([1 / (3 * math.perm(len(CHANGE_TYPES), len(combo))) for combo in CHANGE_TYPE_COMBOS])
 
 def generate_document_id():
     """Generate a realistic document ID in the format CFR-YYYY-NNNNN."""
@@ -71,47 +90,71 @@ def generate_document_id():
     return f"CFR-{year}-{number}"
 
 def create_fake_search_descriptors(db, agency, count=DESCRIPTORS_PER_AGENCY):
-    """Create fake search descriptors for a specific agency."""
+    """
+    Create fake search descriptors for a specific agency.
+    Returns plain row dicts for a bulk Core insert.
+    """
     descriptors = []
     
+    # Draw every random field for the whole batch up front; integers() excludes
+    # the high end, so the bounds are one past the old randint ranges
+    start_days = rng.integers(365, 3651, size=count).tolist()  # 1-10 years ago
+    duration_days = rng.integers(365, 1826, size=count).tolist()  # 1-5 years later
+    title_nums = rng.integers(1, 51, size=count).tolist()
+    chapter_nums = rng.integers(1, 21, size=count).tolist()
+    part_nums = rng.integers(1, 101, size=count).tolist()
+    subparts = (65 + rng.integers(0, 26, size=count)).tolist()  # A-Z
+    title_headings = BS_POOL[rng.integers(0, POOL_SIZE, size=count)].tolist()
+    chapter_headings = CATCH_PHRASE_POOL[rng.integers(0, POOL_SIZE, size=count)].tolist()
+    part_headings = CATCH_PHRASE_POOL[rng.integers(0, POOL_SIZE, size=count)].tolist()
+    subpart_headings = BS_POOL[rng.integers(0, POOL_SIZE, size=count)].tolist()
+    excerpts = PARAGRAPH_POOL[rng.integers(0, POOL_SIZE, size=count)].tolist()
+    types = DESCRIPTOR_TYPES[rng.integers(0, len(DESCRIPTOR_TYPES), size=count)].tolist()
+    reserved = (rng.random(count) < 0.05).tolist()  # 5% chance of being reserved
+    removed = (rng.random(count) < 0.1).tolist()    # 10% chance of being removed
+    scores = rng.uniform(0.5, 1.0, size=count).tolist()
+    combos = rng.choice(len(CHANGE_TYPE_COMBOS), size=count, p=CHANGE_TYPE_WEIGHTS).tolist()
+    statuses = rng.integers(0, 4, size=count).tolist()  # 0=not processed, 1=processing, 2=completed, 3=error
+    
+    today = date.today()
     for i in range(count):
         # Generate dates with some randomness
-        starts_on = date.today() - timedelta(days=random.randint(365, 3650))  # 1-10 years ago
-        ends_on = starts_on + timedelta(days=random.randint(365, 1825))  # 1-5 years later
+        starts_on = today - timedelta(days=start_days[i])
+        ends_on = starts_on + timedelta(days=duration_days[i])
         
         # Generate hierarchy data
         hierarchy = {
-            "title": random.randint(1, 50),
-            "chapter": random.randint(1, 20),
-            "part": random.randint(1, 100),
-            "subpart": chr(65 + random.randint(0, 25))  # A-Z
+            "title": title_nums[i],
+            "chapter": chapter_nums[i],
+            "part": part_nums[i],
+            "subpart": chr(subparts[i])
         }
         
         # Generate headings
         headings = {
-            "title": f"Title {hierarchy['title']} - {fake.bs().title()}",
-            "chapter": f"Chapter {hierarchy['chapter']} - {fake.catch_phrase().title()}",
-            "part": f"Part {hierarchy['part']} - {fake.catch_phrase().title()}",
-            "subpart": f"Subpart {hierarchy['subpart']} - {fake.bs().title()}"
+            "title": f"Title {hierarchy['title']} - {title_headings[i]}",
+            "chapter": f"Chapter {hierarchy['chapter']} - {chapter_headings[i]}",
+            "part": f"Part {hierarchy['part']} - {part_headings[i]}",
+            "subpart": f"Subpart {hierarchy['subpart']} - {subpart_headings[i]}"
         }
         
-        # Create descriptor
-        descriptor = AgencyTitleSearchDescriptor(
+        # Create descriptor row
+        descriptor = dict(
             id=uuid.uuid4(),
             agency_id=agency.id,
             starts_on=starts_on,
             ends_on=ends_on,
-            type=random.choice(DESCRIPTOR_TYPES),
+            type=types[i],
             structure_index=i,
-            reserved=random.random() < 0.05,  # 5% chance of being reserved
-            removed=random.random() < 0.1,    # 10% chance of being removed
+            reserved=reserved[i],
+            removed=removed[i],
             hierarchy=hierarchy,
             hierarchy_headings=headings,
             headings=headings,
-            full_text_excerpt=fake.paragraph(nb_sentences=3),
-            score=random.uniform(0.5, 1.0),
-            change_types=random.sample(["ADDED", "MODIFIED", "REMOVED", "UNCHANGED"], k=random.randint(1, 3)),
-            processing_status=random.randint(0, 3)  # 0=not processed, 1=processing, 2=completed, 3=error
+            full_text_excerpt=excerpts[i],
+            score=scores[i],
+            change_types=list(CHANGE_TYPE_COMBOS[combos[i]]),
+            processing_status=statuses[i]
         )
         
         descriptors.append(descriptor)
@@ -119,7 +162,7 @@ def create_fake_search_descriptors(db, agency, count=DESCRIPTORS_PER_AGENCY):
     return descriptors
 
 def create_document_from_descriptor(descriptor, agency):
-    """Create a document based on a search descriptor."""
+    """Create a document row based on a search descriptor row."""
     # Generate a realistic title
     topic = random.choice(REGULATION_TOPICS)
     sector = random.choice(REGULATION_SECTORS)
@@ -131,24 +174,25 @@ def create_document_from_descriptor(descriptor, agency):
     updated_date = created_date + timedelta(days=random.randint(1, 365))  # 1 day to 1 year later
     
     # Extract title from descriptor headings if available
-    if descriptor.headings and "title" in descriptor.headings:
-        title_prefix = descriptor.headings["title"].split(" - ")[1] if " - " in descriptor.headings["title"] else ""
+    headings = descriptor["headings"]
+    if headings and "title" in headings:
+        title_prefix = headings["title"].split(" - ")[1] if " - " in headings["title"] else ""
         if title_prefix:
             title = f"{title_prefix}: {title}"
     
-    # Create document
-    document = AgencyDocument(
+    # Create document row
+    document = dict(
         id=uuid.uuid4(),
         title=title,
         document_id=generate_document_id(),
-        content=fake.text(max_nb_chars=2000),  # Sample content
+        content=random.choice(CONTENT_POOL),  # Sample content
         agency_metadata={
             "type": random.choice(["Rule", "Regulation", "Guidance", "Advisory", "Standard"]),
             "status": random.choice(["Active", "Proposed", "Under Review", "Archived"]),
             "priority": random.choice(["High", "Medium", "Low"]),
             "category": random.choice(["Administrative", "Technical", "Procedural", "Financial", "Operational"]),
-            "descriptor_type": descriptor.type,
-            "hierarchy": descriptor.hierarchy
+            "descriptor_type": descriptor["type"],
+            "hierarchy": descriptor["hierarchy"]
         },
         created_at=created_date,
         updated_at=updated_date,
@@ -157,9 +201,19 @@ def create_document_from_descriptor(descriptor, agency):
     
     return document
 
+def insert_rows(db, model, rows):
+    """
+    Insert rows with a Core executemany, which skips ORM object
+    construction and the unit-of-work flush.
+    """
+    db.execute(model.__table__.insert(), rows)
+    db.commit()
+
 def main():
     """Main function to generate fake documents."""
-    db = SessionLocal()
+    # Rows go in through Core inserts, so keep loaded agencies usable across
+    # commits instead of refreshing each one with another query
+    db = SessionLocal(expire_on_commit=False)
     try:
         # Get all agencies
         agencies = db.query(Agency).all()
@@ -169,6 +223,13 @@ def main():
             print("No agencies found. Please create agencies first.")
             return
         
+        # Count existing descriptors for every agency in one grouped query
+        existing_descriptor_counts = dict(
+            db.query(AgencyTitleSearchDescriptor.agency_id, func.count(AgencyTitleSearchDescriptor.id))
+            .group_by(AgencyTitleSearchDescriptor.agency_id)
+            .all()
+        )
+        
         total_descriptors = 0
         total_documents = 0
         
@@ -177,9 +238,7 @@ def main():
             print(f"Processing agency: {agency.name}")
             
             # Check if descriptors already exist for this agency
-            existing_descriptor_count = db.query(func.count(AgencyTitleSearchDescriptor.id))\
-                .filter(AgencyTitleSearchDescriptor.agency_id == agency.id)\
-                .scalar()
+            existing_descriptor_count = existing_descriptor_counts.get(agency.id, 0)
             
             if existing_descriptor_count >= DESCRIPTORS_PER_AGENCY:
                 print(f"  Agency {agency.name} already has {existing_descriptor_count} descriptors, skipping")
@@ -189,8 +248,7 @@ def main():
             descriptors = create_fake_search_descriptors(db, agency)
             
             # Add descriptors to database
-            db.add_all(descriptors)
-            db.commit()
+            insert_rows(db, AgencyTitleSearchDescriptor, descriptors)
             total_descriptors += len(descriptors)
             print(f"  Created {len(descriptors)} search descriptors")
             
@@ -202,16 +260,14 @@ def main():
                 
                 # Insert in batches to avoid memory issues
                 if len(documents) >= BATCH_SIZE:
-                    db.add_all(documents)
-                    db.commit()
+                    insert_rows(db, AgencyDocument, documents)
                     print(f"  Inserted batch of {len(documents)} documents")
                     total_documents += len(documents)
                     documents = []
             
             # Insert any remaining documents
             if documents:
-                db.add_all(documents)
-                db.commit()
+                insert_rows(db, AgencyDocument, documents)
                 print(f"  Inserted final batch of {len(documents)} documents")
                 total_documents += len(documents)
             
@@ -7,11 +7,13 @@ This script creates 20 years of historical data (one entry per year) for each do
 import sys
 import os
 import random
+import csv
+import io
 from datetime import datetime, date, timedelta
 import uuid
 from faker import Faker
 import numpy as np
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import func
 
 # Add the parent directory to sys.path to allow imports from the app package
@@ -19,7 +21,6 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.database import SessionLocal, engine
 from app.models.agency import Agency
-from app.models.document import AgencyDocument
 from app.models.metrics import AgencyRegulationDocumentHistoricalMetrics
 
 fake = Faker()
@@ -29,7 +30,8 @@ START_YEAR = 2003  # 20 years ago
 END_YEAR = 2023    # Current year
 METRICS_DAY = 31   # Day of month for metrics (31 for end of year)
 METRICS_MONTH = 12 # Month for metrics (12 for December)
-BATCH_SIZE = 100   # Number of metrics to insert at once
+BATCH_SIZE = 5000  # Number of metrics to insert at once
+SNAPSHOT_POOL_SIZE = 256  # Distinct content snapshots to draw from
 
 # Ranges for random data generation
 WORD_COUNT_RANGE = (1000, 50000)
@@ -45,18 +47,26 @@ AUTHOR_COUNT_RANGE = (1, 20)
 REVISION_AUTHOR_RANGE = (1, 5)
 SIMPLICITY_SCORE_RANGE = (0.1, 1.0)
 
-def generate_trending_value(base_value, year_index, trend_factor=0.02, volatility=0.1):
-    """Generate a value that follows a trend over time with some volatility."""
+# Snapshots are interchangeable noise and faker's text builder is slow,
+# so generate a pool once instead of one per metrics row
+SNAPSHOT_POOL = [fake.text(max_nb_chars=500) for _ in range(SNAPSHOT_POOL_SIZE)]
+
+# Shared generator; NumPy draws a whole document's years in one call
+rng = np.random.default_rng()
+
+def generate_trending_values(base_value, year_index, trend_factor=0.02, volatility=0.1):
+    """Generate values for every year that follow a trend with some volatility."""
     # Apply trend (documents tend to get more complex over time)
     trend = base_value * (1 + trend_factor * year_index)
     # Add random volatility
-    volatility_factor = random.uniform(-volatility, volatility)
+    volatility_factor = rng.uniform(-volatility, volatility, year_index.shape[0])
     return trend * (1 + volatility_factor)
 
 def create_metrics_for_document(db: Session, document, years):
-    """Create historical metrics for a single document across multiple years."""
-    metrics_list = []
-    
+    """
+    Create historical metrics for a single document across multiple years.
+    Returns plain row dicts for a bulk Core insert.
+    """
     # Base values for this document
     base_word_count = random.randint(*WORD_COUNT_RANGE)
     base_paragraph_count = random.randint(*PARAGRAPH_COUNT_RANGE)
@@ -69,76 +79,118 @@ def create_metrics_for_document(db: Session, document, years):
     base_word_length = random.uniform(*WORD_LENGTH_RANGE)
     base_simplicity = random.uniform(*SIMPLICITY_SCORE_RANGE)
     
-    # Generate metrics for each year
-    for i, year in enumerate(years):
-        # Create a date for the metrics (end of year)
-        metrics_date = date(year, METRICS_MONTH, METRICS_DAY)
-        
-        # Generate trending values (documents tend to get longer and more complex over time)
-        word_count = int(generate_trending_value(base_word_count, i, 0.03, 0.1))
-        paragraph_count = int(generate_trending_value(base_paragraph_count, i, 0.02, 0.08))
-        sentence_count = int(generate_trending_value(base_sentence_count, i, 0.025, 0.09))
-        section_count = int(generate_trending_value(base_section_count, i, 0.01, 0.05))
-        subpart_count = int(generate_trending_value(base_subpart_count, i, 0.005, 0.03))
-        
-        # Complexity tends to increase, readability tends to decrease
-        complexity_score = min(1.0, generate_trending_value(base_complexity, i, 0.02, 0.07))
-        readability_score = max(30, base_readability * (1 - 0.01 * i) * (1 + random.uniform(-0.05, 0.05)))
-        
-        # Other metrics
-        avg_sentence_length = generate_trending_value(base_sentence_length, i, 0.01, 0.06)
-        avg_word_length = generate_trending_value(base_word_length, i, 0.005, 0.03)
-        
-        # Fix for the total_authors calculation to ensure it's at least 1
-        total_authors = max(1, min(50, int(base_word_count / 5000) + i))  # More authors over time, at least 1
-        
-        # Fix for the revision_authors calculation to avoid random.randint with equal arguments
-        if total_authors <= 1:
-            revision_authors = 1
-        else:
-            # Ensure we have a valid range for randint
-            max_revision = min(5, total_authors)
-            if max_revision == 1:
-                revision_authors = 1
-            else:
-                revision_authors = random.randint(1, max_revision)
-        
-        # Simplicity score (inverse of complexity)
-        simplicity_score = max(0.1, min(1.0, base_simplicity * (1 - 0.015 * i) * (1 + random.uniform(-0.05, 0.05))))
-        
-        # Create a metrics object
-        metrics = AgencyRegulationDocumentHistoricalMetrics(
+    # Compute every metric for all years at once; i is the year index
+    n_years = len(years)
+    i = np.arange(n_years)
+    
+    # Generate trending values (documents tend to get longer and more complex over time)
+    word_count = generate_trending_values(base_word_count, i, 0.03, 0.1).astype(np.int64)
+    paragraph_count = generate_trending_values(base_paragraph_count, i, 0.02, 0.08).astype(np.int64)
+    sentence_count = generate_trending_values(base_sentence_count, i, 0.025, 0.09).astype(np.int64)
+    section_count = generate_trending_values(base_section_count, i, 0.01, 0.05).astype(np.int64)
+    subpart_count = generate_trending_values(base_subpart_count, i, 0.005, 0.03).astype(np.int64)
+    
+    # Complexity tends to increase, readability tends to decrease
+    complexity_score = np.minimum(1.0, generate_trending_values(base_complexity, i, 0.02, 0.07))
+    readability_score = np.maximum(30, base_readability * (1 - 0.01 * i) * (1 + rng.uniform(-0.05, 0.05, n_years)))
+    
+    # Other metrics
+    avg_sentence_length = generate_trending_values(base_sentence_length, i, 0.01, 0.06)
+    avg_word_length = generate_trending_values(base_word_length, i, 0.005, 0.03)
+    
+    # More authors over time, between 1 and 50
+    total_authors = np.clip(int(base_word_count / 5000) + i, 1, 50)
+    
+    # Between 1 and min(5, total_authors) revision authors (integers() excludes the high end)
+    revision_authors = rng.integers(1, np.minimum(5, total_authors) + 1)
+    
+    # Simplicity score (inverse of complexity)
+    simplicity_score = np.clip(base_simplicity * (1 - 0.015 * i) * (1 + rng.uniform(-0.05, 0.05, n_years)), 0.1, 1.0)
+    
+    # Build one metrics row per year; tolist() turns NumPy scalars into the
+    # Python ints/floats the database driver can adapt
+    return [
+        dict(
             id=uuid.uuid4(),
-            metrics_date=metrics_date,
-            word_count=word_count,
-            paragraph_count=paragraph_count,
-            sentence_count=sentence_count,
-            section_count=section_count,
-            subpart_count=subpart_count,
-            language_complexity_score=complexity_score,
-            readability_score=readability_score,
-            average_sentence_length=avg_sentence_length,
-            average_word_length=avg_word_length,
-            total_authors=total_authors,
-            revision_authors=revision_authors,
-            simplicity_score=simplicity_score,
-            content_snapshot=fake.text(max_nb_chars=500),  # Just a sample, not the full content
+            metrics_date=date(year, METRICS_MONTH, METRICS_DAY),  # End of year
+            word_count=values[0],
+            paragraph_count=values[1],
+            sentence_count=values[2],
+            section_count=values[3],
+            subpart_count=values[4],
+            language_complexity_score=values[5],
+            readability_score=values[6],
+            average_sentence_length=values[7],
+            average_word_length=values[8],
+            total_authors=values[9],
+            revision_authors=values[10],
+            simplicity_score=values[11],
+            content_snapshot=random.choice(SNAPSHOT_POOL),  # Just a sample, not the full content
             agency_id=document.agency_id,
             document_id=document.id
         )
-        
-        metrics_list.append(metrics)
+        for year, *values in zip(
+            years,
+            word_count.tolist(),
+            paragraph_count.tolist(),
+            sentence_count.tolist(),
+            section_count.tolist(),
+            subpart_count.tolist(),
+            complexity_score.tolist(),
+            readability_score.tolist(),
+            avg_sentence_length.tolist(),
+            avg_word_length.tolist(),
+            total_authors.tolist(),
+            revision_authors.tolist(),
+            simplicity_score.tolist()
+        )
+    ]
+
+def insert_metrics(db: Session, metrics_rows):
+    """
+    Bulk-load metrics rows with PostgreSQL COPY FROM STDIN, which streams
+    the batch as one CSV payload instead of issuing INSERT statements.
+    """
+    columns = list(metrics_rows[0].keys())
+    
+    # csv quotes the multi-line snapshots; None is written as an empty
+    # unquoted field, which COPY reads as NULL
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in metrics_rows:
+        writer.writerow([row[column] for column in columns])
+    buf.seek(0)
     
-    return metrics_list
+    # Run the COPY on the session's own connection so it commits with the session
+    raw = db.connection().connection
+    with raw.cursor() as cur:
+        cur.copy_expert(
+            f"COPY {AgencyRegulationDocumentHistoricalMetrics.__tablename__} ({', '.join(columns)}) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buf
+        )
+    db.commit()
 
 def main():
     """Main function to generate fake metrics data."""
-    db = SessionLocal()
+    # Metrics go in through COPY, so keep loaded agencies and documents usable
+    # across commits instead of refreshing each one with another query
+    db = SessionLocal(expire_on_commit=False)
     try:
-        # Get all agencies
-        agencies = db.query(Agency).all()
+        # Get all agencies, loading their documents in one extra query
+        agencies = db.query(Agency).options(selectinload(Agency.documents)).all()
         print(f"Found {len(agencies)} agencies")
         
+        # Count existing metrics for every agency in one grouped query
+        existing_metrics_counts = dict(
+            db.query(
+                AgencyRegulationDocumentHistoricalMetrics.agency_id,
+                func.count(AgencyRegulationDocumentHistoricalMetrics.id)
+            )
+            .group_by(AgencyRegulationDocumentHistoricalMetrics.agency_id)
+            .all()
+        )
+        
         # Years to generate data for
         years = list(range(START_YEAR, END_YEAR + 1))
         
@@ -147,7 +199,7 @@ def main():
             print(f"Processing agency: {agency.name}")
             
             # Get all documents for this agency
-            documents = db.query(AgencyDocument).filter(AgencyDocument.agency_id == agency.id).all()
+            documents = agency.documents
             print(f"  Found {len(documents)} documents")
             
             if not documents:
@@ -155,9 +207,7 @@ def main():
                 continue
             
             # Check if metrics already exist for this agency
-            existing_metrics_count = db.query(func.count(AgencyRegulationDocumentHistoricalMetrics.id))\
-                .filter(AgencyRegulationDocumentHistoricalMetrics.agency_id == agency.id)\
-                .scalar()
+            existing_metrics_count = existing_metrics_counts.get(agency.id, 0)
             
             if existing_metrics_count > 0:
                 print(f"  Agency {agency.name} already has {existing_metrics_count} metrics, skipping")
@@ -172,8 +222,7 @@ def main():
                     
                     # Insert in batches to avoid memory issues
                     if len(all_metrics) >= BATCH_SIZE:
-                        db.add_all(all_metrics)
-                        db.commit()
+                        insert_metrics(db, all_metrics)
                         print(f"  Inserted batch of {len(all_metrics)} metrics")
                         all_metrics = []
                     
@@ -186,8 +235,7 @@ def main():
             
             # Insert any remaining metrics
             if all_metrics:
-                db.add_all(all_metrics)
-                db.commit()
+                insert_metrics(db, all_metrics)
                 print(f"  Inserted final batch of {len(all_metrics)} metrics")
             
             print(f"  Completed processing for agency: {agency.name}")
@@ -1,38 +1,16 @@
 import os
+import py_compile
+import shlex
 import shutil
 import subprocess
+import threading
 from pathlib import Path
 
-def run_command(command):
-    """Run a shell command and print the output"""
-    process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-    for line in iter(process.stdout.readline, b''):
-        print(line.decode('utf-8').strip())
-    process.stdout.close()
-    return process.wait()
+# Project root directory, resolved once
+BASE_DIR = Path(__file__).resolve().parent.parent
 
-def init_alembic():
-    """Initialize Alembic directory structure"""
-    # Get the project root directory
-    BASE_DIR = Path(__file__).resolve().parent.parent
-    
-    # Check if alembic directory exists
-    alembic_dir = BASE_DIR / "alembic"
-    if alembic_dir.exists():
-        print(f"Removing existing alembic directory: {alembic_dir}")
-        shutil.rmtree(alembic_dir)
-    
-    # Initialize alembic
-    print("Initializing alembic...")
-    run_command("alembic init alembic")
-    
-    # Update env.py with our custom code
-    env_py = alembic_dir / "env.py"
-    with open(env_py, "r") as f:
-        env_content = f.read()
-    
-    # Replace the content with our custom env.py
-    env_content = """from logging.config import fileConfig
+# Custom env.py written over the one generated by `alembic init`
+ENV_TEMPLATE = """from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
@@ -60,7 +38,7 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 # Load environment variables from .env file
-load_dotenv(os.path.join(BASE_DIR, ".env"))
+load_dotenv(BASE_DIR / ".env")
 
 # Override sqlalchemy.url with the one from environment if available
 db_url = os.getenv("DATABASE_URL")
@@ -113,9 +91,52 @@ if context.is_offline_mode():
 else:
     run_migrations_online()
 """
+
+def run_command(command):
+    """Run a command and print the output"""
+    # No shell in between, and the output is collected from the pipe in one go
+    # rather than read and decoded line by line
+    result = subprocess.run(
+        shlex.split(command),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        check=False
+    )
+    print(result.stdout, end='')
+    return result.returncode
+
+def init_alembic():
+    """Initialize Alembic directory structure"""
+    # Check if alembic directory exists
+    alembic_dir = BASE_DIR / "alembic"
+    cleanup = None
+    if alembic_dir.exists():
+        print(f"Removing existing alembic directory: {alembic_dir}")
+        # Move the old tree out of the way with one rename and delete it while
+        # alembic init runs, instead of waiting for every unlink first
+        old_dir = alembic_dir.with_suffix(".old")
+        if old_dir.exists():
+            shutil.rmtree(old_dir)
+        alembic_dir.rename(old_dir)
+        cleanup = threading.Thread(target=shutil.rmtree, args=(old_dir,))
+        cleanup.start()
+    
+    # Initialize alembic
+    print("Initializing alembic...")
+    run_command("alembic init alembic")
+    
+    # Replace the generated env.py with our custom one; the generated
+    # content is never used, so it is overwritten without being read
+    env_py = alembic_dir / "env.py"
+    env_py.write_text(ENV_TEMPLATE)
+    
+    # Alembic imports env.py on every command; compile it into __pycache__ now
+    # so the first migration run does not have to
+    py_compile.compile(str(env_py), doraise=True)
     
-    with open(env_py, "w") as f:
-        f.write(env_content)
+    if cleanup is not None:
+        cleanup.join()
     
     print("Alembic initialization complete!")
 
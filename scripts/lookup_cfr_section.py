@@ -7,6 +7,8 @@ created by the convert_cfr_xml_to_json.py script.
 
 Usage:
     python lookup_cfr_section.py --year YEAR --title TITLE --part PART --section SECTION [--json-dir JSON_DIR]
+    python lookup_cfr_section.py --batch-file QUERIES_TSV [--json-dir JSON_DIR]
+    python lookup_cfr_section.py --prefetch --year YEAR --title TITLE [--json-dir JSON_DIR]
 
 Example:
     python lookup_cfr_section.py --year 1996 --title 21 --part 1 --section 1.1
@@ -16,102 +18,448 @@ import os
 import json
 import argparse
 import sys
+import mmap
+import sqlite3
+import threading
+from pathlib import Path
+from functools import lru_cache
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
+# Section store written by convert_cfr_xml_to_json.py next to the JSON files
+STORE_FILENAME = "sections.db"
+
+class CFRDataError(Exception):
+    """Raised when the converted CFR JSON data is missing or unreadable."""
+
+def read_json(path):
+    """Read a JSON file, using orjson's C parser on the raw bytes when available."""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            # orjson parses straight out of the page cache through a memoryview
+            # of the mapping, with no intermediate bytes copy of the file. An
+            # empty file cannot be mapped; it is read normally and rejected below.
+            if os.fstat(f.fileno()).st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    with memoryview(mm) as view:
+                        return orjson.loads(view)
+
+    # read_bytes() reads unbuffered with no text decoding layer; both parsers
+    # accept UTF-8 bytes directly
+    data = Path(path).read_bytes()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# Failed loads raise instead of exiting, so lru_cache never stores them
+@lru_cache(maxsize=4)
 def load_index(json_dir):
     """Load the CFR index file."""
     index_path = os.path.join(json_dir, "index.json")
     try:
-        with open(index_path, 'r') as f:
-            return json.load(f)
+        index = read_json(index_path)
     except FileNotFoundError:
-        print(f"Error: Index file not found at {index_path}")
-        print("Please run convert_cfr_xml_to_json.py first to create the JSON data.")
-        sys.exit(1)
-    except json.JSONDecodeError:
-        print(f"Error: Invalid JSON in index file {index_path}")
-        sys.exit(1)
+        raise CFRDataError(
+            f"Index file not found at {index_path}\n"
+            "Please run convert_cfr_xml_to_json.py first to create the JSON data."
+        )
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise CFRDataError(f"Invalid JSON in index file {index_path}")
+    except OSError as e:
+        raise CFRDataError(f"Cannot read index file {index_path}: {e}")
+
+    # Section lists are only used for membership tests and sorted listings, so
+    # store them as frozensets once for O(1) membership on every lookup
+    try:
+        for titles in index.values():
+            for title_index in titles.values():
+                for part_index in title_index["parts"].values():
+                    part_index["sections"] = frozenset(part_index["sections"])
+    except (KeyError, TypeError, AttributeError):
+        raise CFRDataError(f"Unexpected structure in index file {index_path}")
+
+    return index
 
+@lru_cache(maxsize=32)
 def load_title_data(json_dir, year, title):
     """Load the data for a specific title and year."""
     file_path = os.path.join(json_dir, year, f"title_{title}.json")
     try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
+        title_data = read_json(file_path)
     except FileNotFoundError:
-        print(f"Error: Title data file not found at {file_path}")
-        sys.exit(1)
-    except json.JSONDecodeError:
-        print(f"Error: Invalid JSON in title data file {file_path}")
-        sys.exit(1)
+        raise CFRDataError(f"Title data file not found at {file_path}")
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise CFRDataError(f"Invalid JSON in title data file {file_path}")
+    except OSError as e:
+        raise CFRDataError(f"Cannot read title data file {file_path}: {e}")
 
-def lookup_section(json_dir, year, title, part, section):
-    """Look up a specific CFR section."""
-    # Load the index to verify the requested data exists
+    # Cached titles live for the whole process; intern the short, heavily
+    # repeated strings (numbers and headings) so every cached title shares them
+    try:
+        for part_data in title_data["parts"].values():
+            part_data["part_number"] = sys.intern(part_data["part_number"])
+            part_data["part_title"] = sys.intern(part_data["part_title"])
+            for section_data in part_data["sections"].values():
+                section_data["section_number"] = sys.intern(section_data["section_number"])
+                section_data["section_title"] = sys.intern(section_data["section_title"])
+    except (KeyError, TypeError, AttributeError):
+        raise CFRDataError(f"Unexpected structure in title data file {file_path}")
+
+    return title_data
+
+# sqlite3 connections must not be shared between threads, so each thread keeps
+# its own per json_dir. clear_caches() bumps the generation, which makes every
+# thread reopen its connections on next use.
+_thread_stores = threading.local()
+_store_generation = 0
+
+def open_store(json_dir):
+    """Open this thread's read-only section store, or return None if it was not built."""
+    if getattr(_thread_stores, "generation", None) != _store_generation:
+        for store in getattr(_thread_stores, "stores", {}).values():
+            store.close()
+        _thread_stores.stores = {}
+        _thread_stores.generation = _store_generation
+
+    store = _thread_stores.stores.get(json_dir)
+    if store is None:
+        # A missing store is not remembered, so one built later is picked up
+        store_path = os.path.join(json_dir, STORE_FILENAME)
+        if not os.path.exists(store_path):
+            return None
+        store = sqlite3.connect(f"file:{store_path}?mode=ro", uri=True)
+        _thread_stores.stores[json_dir] = store
+    return store
+
+def _column(store, query, *params):
+    """Return the first column of every row of a store query."""
+    return [row[0] for row in store.execute(query, params)]
+
+def lookup_section_in_store(store, year, title, part, section):
+    """Look up a CFR section with a single primary-key read from the section store."""
+    try:
+        row = store.execute(
+            "SELECT data FROM sections WHERE year = ? AND title = ? AND part = ? AND section = ?",
+            (year, title, part, section)
+        ).fetchone()
+        if row is not None:
+            return orjson.loads(row[0]) if orjson is not None else json.loads(row[0])
+        
+        # Only a miss pays for working out which level is missing
+        if not _column(store, "SELECT 1 FROM titles WHERE year = ? LIMIT 1", year):
+            print(f"Error: No data available for year {year}")
+            print(f"Available years: {', '.join(_column(store, 'SELECT DISTINCT year FROM titles ORDER BY year'))}")
+            return None
+        
+        if not _column(store, "SELECT 1 FROM titles WHERE year = ? AND title = ?", year, title):
+            titles = _column(store, "SELECT title FROM titles WHERE year = ? ORDER BY title", year)
+            print(f"Error: No data available for title {title} in year {year}")
+            print(f"Available titles for {year}: {', '.join(titles)}")
+            return None
+        
+        if not _column(store, "SELECT 1 FROM parts WHERE year = ? AND title = ? AND part = ?", year, title, part):
+            parts = _column(store, "SELECT part FROM parts WHERE year = ? AND title = ? ORDER BY part", year, title)
+            print(f"Error: No data available for part {part} in title {title}, year {year}")
+            print(f"Available parts: {', '.join(parts)}")
+            return None
+        
+        sections = _column(
+            store,
+            "SELECT section FROM sections WHERE year = ? AND title = ? AND part = ? ORDER BY section",
+            year, title, part
+        )
+        print(f"Error: No data available for section {section} in part {part}, title {title}, year {year}")
+        print(f"Available sections: {', '.join(sections)}")
+        return None
+    except sqlite3.Error as e:
+        # Surface a corrupt or mismatched store like any other unreadable data
+        raise CFRDataError(f"Unreadable section store: {e}") from e
+
+@lru_cache(maxsize=256)
+def available(json_dir, year=None, title=None, part=None):
+    """
+    List what the index holds at one level (years, titles, parts or sections),
+    sorted and comma-separated. Cached, so repeated misses do not re-sort.
+    """
+    index = load_index(json_dir)
+    if year is None:
+        keys = index.keys()
+    elif title is None:
+        keys = index[year].keys()
+    elif part is None:
+        keys = index[year][title]["parts"].keys()
+    else:
+        keys = index[year][title]["parts"][part]["sections"]
+    return ', '.join(sorted(keys))
+
+def report_missing(json_dir, year, title, part, section):
+    """
+    Print which of the year, title, part or section is missing from the index.
+    Returns False if the index lists all of them.
+    """
     index = load_index(json_dir)
-    
+
     # Check if the requested year exists
     if year not in index:
         print(f"Error: No data available for year {year}")
-        print(f"Available years: {', '.join(sorted(index.keys()))}")
-        return None
-    
+        print(f"Available years: {available(json_dir)}")
+        return True
+
     # Check if the requested title exists
     if title not in index[year]:
         print(f"Error: No data available for title {title} in year {year}")
-        print(f"Available titles for {year}: {', '.join(sorted(index[year].keys()))}")
-        return None
-    
+        print(f"Available titles for {year}: {available(json_dir, year)}")
+        return True
+
     # Check if the requested part exists
     if part not in index[year][title]["parts"]:
         print(f"Error: No data available for part {part} in title {title}, year {year}")
-        print(f"Available parts: {', '.join(sorted(index[year][title]['parts'].keys()))}")
-        return None
-    
+        print(f"Available parts: {available(json_dir, year, title)}")
+        return True
+
     # Check if the requested section exists
     if section not in index[year][title]["parts"][part]["sections"]:
         print(f"Error: No data available for section {section} in part {part}, title {title}, year {year}")
-        print(f"Available sections: {', '.join(sorted(index[year][title]['parts'][part]['sections']))}")
-        return None
-    
-    # Load the title data
-    title_data = load_title_data(json_dir, year, title)
-    
-    # Extract the section data (O(1) lookup)
-    section_data = title_data["parts"][part]["sections"][section]
-    
-    return section_data
+        print(f"Available sections: {available(json_dir, year, title, part)}")
+        return True
+
+    return False
+
+def load_section_streaming(json_dir, year, title, part, section):
+    """
+    Stream a title file and build only the requested section, without
+    materializing the rest of the title. Returns None if it is not there.
+    """
+    file_path = os.path.join(json_dir, year, f"title_{title}.json")
+    try:
+        with open(file_path, 'rb') as f:
+            return next(ijson.items(f, f"parts.{part}.sections.{section}"), None)
+    except FileNotFoundError:
+        raise CFRDataError(f"Title data file not found at {file_path}")
+    except ijson.JSONError:
+        raise CFRDataError(f"Invalid JSON in title data file {file_path}")
+    except OSError as e:
+        raise CFRDataError(f"Cannot read title data file {file_path}: {e}")
+
+def lookup_section_in_title_files(json_dir, year, title, part, section, stream=False):
+    """
+    Look up a CFR section in the title JSON files. With stream=True and ijson
+    installed, only the section is parsed; otherwise the whole title is loaded
+    and cached for further lookups.
+    """
+    # Go straight to the title file; the index is only read on a miss, to
+    # say which level is missing
+    try:
+        if stream and ijson is not None:
+            section_data = load_section_streaming(json_dir, year, title, part, section)
+            if section_data is None:
+                raise KeyError(section)
+            return section_data
+        
+        title_data = load_title_data(json_dir, year, title)
+        
+        # Extract the section data (O(1) lookup). The title is cached, so hand
+        # out a copy; section values are all strings, so a shallow one will do
+        return dict(title_data["parts"][part]["sections"][section])
+    except (CFRDataError, KeyError) as e:
+        if report_missing(json_dir, year, title, part, section):
+            return None
+        if isinstance(e, CFRDataError):
+            raise
+        raise CFRDataError(
+            f"Section {section} of part {part} is listed in index.json but missing "
+            f"from title_{title}.json for {year}"
+        ) from e
+
+def lookup_section(json_dir, year, title, part, section):
+    """Look up a specific CFR section."""
+    # Read a single row from the section store when the converter built one
+    store = open_store(json_dir)
+    if store is not None:
+        return lookup_section_in_store(store, year, title, part, section)
+
+    # A single lookup streams just its section; lookup_sections loads whole
+    # titles, since it reads many sections from each
+    return lookup_section_in_title_files(json_dir, year, title, part, section, stream=True)
+
+def lookup_sections(json_dir, items):
+    """
+    Look up many CFR sections given as (year, title, part, section) tuples.
+    Returns a dict mapping each tuple to its section data, or None if missing.
+    """
+    store = open_store(json_dir)
+
+    # Group the requests by title so each title file is parsed once, however
+    # the requests are ordered and however many titles they span
+    by_title = {}
+    for item in items:
+        by_title.setdefault(tuple(item[:2]), []).append(tuple(item))
+
+    results = {}
+    for group in by_title.values():
+        for item in group:
+            if item in results:
+                continue
+            if store is not None:
+                results[item] = lookup_section_in_store(store, *item)
+            else:
+                results[item] = lookup_section_in_title_files(json_dir, *item)
+
+    return results
+
+def clear_caches():
+    """Drop the cached index, title data and store, e.g. after the JSON is regenerated."""
+    global _store_generation
+    load_index.cache_clear()
+    load_title_data.cache_clear()
+    _store_generation += 1
+    available.cache_clear()
+    _formatted_section.cache_clear()
+
+lookup_section.cache_clear = clear_caches
 
 def format_section_data(section_data):
     """Format section data for display."""
     if not section_data:
         return "No data found."
-    
+
     output = []
     output.append(f"Section: {section_data['section_number']}")
     output.append(f"Title: {section_data['section_title']}")
     output.append("\nContent:")
     output.append(section_data['content'])
-    
+
     return "\n".join(output)
 
+class _SectionMissing(Exception):
+    """Signals a lookup miss out of _formatted_section so it is not cached."""
+
+@lru_cache(maxsize=1024)
+def _formatted_section(json_dir, year, title, part, section):
+    section_data = lookup_section(json_dir, year, title, part, section)
+    if section_data is None:
+        raise _SectionMissing
+    return format_section_data(section_data)
+
+def get_formatted_section(json_dir, year, title, part, section):
+    """
+    Look up a CFR section and format it for display. Found sections are
+    cached; misses are looked up again so their messages are printed each time.
+    """
+    try:
+        return _formatted_section(json_dir, year, title, part, section)
+    except _SectionMissing:
+        return format_section_data(None)
+
+def prefetch_title_in_store(store, year, title):
+    """
+    Read every section row of one title so the store pages holding it are in
+    the page cache. The store holds all years and titles, so only this
+    title's rows are read, not the whole file.
+    """
+    try:
+        if not _column(store, "SELECT 1 FROM titles WHERE year = ? AND title = ?", year, title):
+            raise CFRDataError(f"No data available for title {title} in year {year}")
+        for _ in store.execute("SELECT data FROM sections WHERE year = ? AND title = ?", (year, title)):
+            pass
+    except sqlite3.Error as e:
+        raise CFRDataError(f"Unreadable section store: {e}") from e
+
+def prefetch_title(json_dir, year, title):
+    """
+    Warm the page cache for lookups in one title. With a section store, the
+    title's rows are read from it; otherwise the OS is asked to start reading
+    the title file, without waiting for it.
+    Returns a description of what was prefetched.
+    """
+    store = open_store(json_dir)
+    if store is not None:
+        prefetch_title_in_store(store, year, title)
+        return f"title {title} for {year} from {os.path.join(json_dir, STORE_FILENAME)}"
+
+    path = os.path.join(json_dir, year, f"title_{title}.json")
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        raise CFRDataError(f"Title data file not found at {path}")
+    try:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        elif os.fstat(fd).st_size:
+            # No fadvise (e.g. macOS): the mmap equivalent
+            with mmap.mmap(fd, 0, prot=mmap.PROT_READ) as mm:
+                mm.madvise(mmap.MADV_WILLNEED)
+    finally:
+        os.close(fd)
+    return path
+
+def read_batch_file(path):
+    """Read tab-separated year, title, part and section queries, one per line."""
+    items = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            fields = line.split('\t')
+            if len(fields) != 4:
+                raise CFRDataError(
+                    f"{path}:{line_number}: expected year, title, part and section separated by tabs"
+                )
+            items.append(tuple(fields))
+    return items
+
 def main():
     parser = argparse.ArgumentParser(description="Look up CFR sections from JSON data")
-    parser.add_argument("--year", required=True, help="Year of the CFR (e.g., 1996)")
-    parser.add_argument("--title", required=True, help="CFR title number (e.g., 21)")
-    parser.add_argument("--part", required=True, help="CFR part number (e.g., 1)")
-    parser.add_argument("--section", required=True, help="CFR section number (e.g., 1.1)")
+    parser.add_argument("--year", help="Year of the CFR (e.g., 1996)")
+    parser.add_argument("--title", help="CFR title number (e.g., 21)")
+    parser.add_argument("--part", help="CFR part number (e.g., 1)")
+    parser.add_argument("--section", help="CFR section number (e.g., 1.1)")
+    parser.add_argument("--batch-file", help="TSV file of year, title, part, section queries to look up together")
+    parser.add_argument("--prefetch", action="store_true",
+                        help="Load the sections of --year and --title into the OS page cache and exit")
     parser.add_argument("--json-dir", default="json_cfr", help="Directory containing JSON files")
     args = parser.parse_args()
-    
-    section_data = lookup_section(
-        args.json_dir, 
-        args.year, 
-        args.title, 
-        args.part, 
-        args.section
-    )
-    
-    print(format_section_data(section_data))
+
+    if args.prefetch:
+        if not (args.year and args.title):
+            parser.error("--prefetch requires --year and --title")
+    elif not args.batch_file and not all([args.year, args.title, args.part, args.section]):
+        parser.error("--year, --title, --part and --section are required without --batch-file")
+
+    try:
+        if args.prefetch:
+            print(f"Prefetching {prefetch_title(args.json_dir, args.year, args.title)}")
+            return
+        if args.batch_file:
+            items = read_batch_file(args.batch_file)
+            results = lookup_sections(args.json_dir, items)
+        else:
+            formatted = get_formatted_section(
+                args.json_dir, 
+                args.year, 
+                args.title, 
+                args.part, 
+                args.section
+            )
+    except CFRDataError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if args.batch_file:
+        # Print the results in input order
+        for year, title, part, section in items:
+            print(f"=== {year} CFR Title {title}, Part {part}, Section {section} ===")
+            print(format_section_data(results[(year, title, part, section)]))
+            print()
+    else:
+        print(formatted)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Build the compiled text walk used by convert_cfr_xml_to_json.py.
+
+Compiles _text_extract.pyx into an extension module next to this script.
+convert_cfr_xml_to_json.py uses it when present and falls back to the
+pure-Python walk otherwise.
+
+Usage:
+    python scripts/setup_text_extract.py build_ext --inplace
+"""
+
+import os
+
+from Cython.Build import cythonize
+from setuptools import Extension, setup
+
+# Build relative to this directory so --inplace puts the module beside the converter
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+setup(
+    name="cfr-text-extract",
+    ext_modules=cythonize(
+        [Extension("_text_extract", ["_text_extract.pyx"])],
+        compiler_directives={"language_level": 3},
+    ),
+)